@@ -40,6 +40,8 @@ from __future__ import division
 from __future__ import print_function  # Python 2/3 compatiblity
 from __future__ import with_statement
 
+import binascii
+import bisect
 import math
 import serial
 import string
@@ -48,9 +50,7 @@ import time
 import weewx
 import weewx.drivers
 import weewx.engine
-import weewx.wxformulas
 import weewx.units
-from weewx.crc16 import crc16
 
 try:
     # Test for new-style weewx logging by trying to import weeutil.logger
@@ -92,6 +92,7 @@ DEBUG_PARSE = 0
 DEBUG_RFS = 0
 
 MPH_TO_MPS = 1609.34 / 3600.0 # meter/mile * hour/second
+WIND_DIR_PRO_SCALE = 342.0 / 253.0 # degrees per raw step, Vantage Pro/Pro2
 
 def loader(config_dict, engine):
     return MeteostickDriver(engine, config_dict)
@@ -107,10 +108,6 @@ def dbg_serial(verbosity, msg):
     if DEBUG_SERIAL >= verbosity:
         logdbg(msg)
 
-def dbg_parse(verbosity, msg):
-    if DEBUG_PARSE >= verbosity:
-        logdbg(msg)
-
 def _fmt(data):
     if not data:
         return ''
@@ -134,31 +131,48 @@ SM_MAP = {RAW: ( 99.2, 140.1, 218.7, 226.9, 266.8, 391.7, 475.6, 538.2, 596.1, 6
 LW_MAP = {RAW: (857.0, 864.0, 895.0, 911.0, 940.0, 952.0, 991.0, 1013.0),
           POT: ( 15.0,  14.0,   5.0,   4.0,   3.0,   2.0,   1.0,    0.0)}
 
+# packet keys of the leaf and soil station, indexed by sensor number (1-8)
+SOIL_TEMP_KEYS = tuple(['soil_temp_%d' % i for i in range(9)])
+SOIL_MOISTURE_KEYS = tuple(['soil_moisture_%d' % i for i in range(9)])
+LEAF_TEMP_KEYS = tuple(['leaf_temp_%d' % i for i in range(9)])
+LEAF_WETNESS_KEYS = tuple(['leaf_wetness_%d' % i for i in range(9)])
 
-def calculate_thermistor_temp(temp_raw):
-    """ Decode the raw thermistor temperature, then calculate the actual
-    thermistor temperature and the leaf_soil potential, using Davis' formulas.
-    see: https://github.com/cmatteri/CC1101-Weather-Receiver/wiki/Soil-Moisture-Station-Protocol
-    :param temp_raw: raw value from sensor for leaf wetness and soil moisture
-    """
 
-    # Convert temp_raw to a resistance (R) in kiloOhms
+def _thermistor_temp(temp_raw):
+    """Steinhart-Hart temperature in degree C for a 10-bit raw value, or
+    None if the raw value does not map to a valid resistance."""
+
+    # Convert temp_raw to a resistance (R) in kiloOhms.
+    # r = a / (1 / temp_raw - b) / 1000, rearranged to need one division
     a = 18.81099
     b = 0.0009988027
-    r = a / (1.0 / temp_raw - b) / 1000 # k ohms
+    r = a * temp_raw / (1000.0 - 1000.0 * b * temp_raw) # k ohms
 
     # Steinhart-Hart parameters
     s1 = 0.002783573
     s2 = 0.0002509406
     try:
-        thermistor_temp = 1 / (s1 + s2 * math.log(r)) - 273
-        dbg_parse(3, 'r (k ohm) %s temp_raw %s thermistor_temp %s' %
-                  (r, temp_raw, thermistor_temp))
-        return thermistor_temp
-    except ValueError as e:
-        logerr('thermistor_temp failed for temp_raw %s r (k ohm) %s'
-               'error: %s' % (temp_raw, r, e))
-    return DEFAULT_SOIL_TEMP
+        return 1 / (s1 + s2 * math.log(r)) - 273
+    except ValueError:
+        return None
+
+# the raw value has only 10 bits, so calculate every temperature once
+THERMISTOR_TEMPS = tuple([_thermistor_temp(i) for i in range(1024)])
+
+
+def calculate_thermistor_temp(temp_raw):
+    """ Decode the raw thermistor temperature, then calculate the actual
+    thermistor temperature and the leaf_soil potential, using Davis' formulas.
+    see: https://github.com/cmatteri/CC1101-Weather-Receiver/wiki/Soil-Moisture-Station-Protocol
+    :param temp_raw: raw value from sensor for leaf wetness and soil moisture
+    """
+    thermistor_temp = THERMISTOR_TEMPS[temp_raw]
+    if thermistor_temp is None:
+        logerr('thermistor_temp failed for temp_raw %s' % temp_raw)
+        return DEFAULT_SOIL_TEMP
+    if DEBUG_PARSE >= 3:
+        logdbg('temp_raw %s thermistor_temp %s' % (temp_raw, thermistor_temp))
+    return thermistor_temp
 
 
 def lookup_potential(sensor_name, norm_fact, sensor_raw, sensor_temp, lookup):
@@ -180,35 +194,37 @@ def lookup_potential(sensor_name, norm_fact, sensor_raw, sensor_temp, lookup):
     numcols = len(lookup[RAW])
     if sensor_raw_norm >= lookup[RAW][numcols - 1]:
         potential = lookup[POT][numcols - 1] # preset potential to last value
-        dbg_parse(3, "%s: temp=%s fact=%s raw=%s norm=%s potential=%s >= RAW=%s" %
-                  (sensor_name, sensor_temp, norm_fact, sensor_raw,
-                   sensor_raw_norm, potential, lookup[RAW][numcols - 1]))
+        if DEBUG_PARSE >= 3:
+            logdbg("%s: temp=%s fact=%s raw=%s norm=%s potential=%s >= RAW=%s" %
+                   (sensor_name, sensor_temp, norm_fact, sensor_raw,
+                    sensor_raw_norm, potential, lookup[RAW][numcols - 1]))
     else:
         potential = lookup[POT][0] # preset potential to first value
-        # lookup sensor_raw_norm value in table
-        for x in range(0, numcols):
-            if sensor_raw_norm < lookup[RAW][x]:
-                if x == 0:
-                    # 'pre zero' phase; potential = first value
-                    dbg_parse(3, "%s: temp=%s fact=%s raw=%s norm=%s potential=%s < RAW=%s" %
-                              (sensor_name, sensor_temp, norm_fact, sensor_raw,
-                               sensor_raw_norm, potential, lookup[RAW][0]))
-                    break
-                else:
-                    # determine the potential value
-                    potential_per_raw = (lookup[POT][x] - lookup[POT][x - 1]) / (lookup[RAW][x] - lookup[RAW][x - 1])
-                    potential_offset = (sensor_raw_norm - lookup[RAW][x - 1]) * potential_per_raw
-                    potential = lookup[POT][x - 1] + potential_offset
-                    dbg_parse(3, "%s: temp=%s fact=%s raw=%s norm=%s potential=%s RAW=%s to %s POT=%s to %s " %
-                              (sensor_name, sensor_temp, norm_fact, sensor_raw,
-                               sensor_raw_norm, potential,
-                               lookup[RAW][x - 1], lookup[RAW][x],
-                               lookup[POT][x - 1], lookup[POT][x]))
-                    break
+        # lookup sensor_raw_norm value in table; the raw values are sorted,
+        # so x is the first column with a raw value above sensor_raw_norm
+        x = bisect.bisect_right(lookup[RAW], sensor_raw_norm)
+        if x == 0:
+            # 'pre zero' phase; potential = first value
+            if DEBUG_PARSE >= 3:
+                logdbg("%s: temp=%s fact=%s raw=%s norm=%s potential=%s < RAW=%s" %
+                       (sensor_name, sensor_temp, norm_fact, sensor_raw,
+                        sensor_raw_norm, potential, lookup[RAW][0]))
+        else:
+            # determine the potential value
+            potential_per_raw = (lookup[POT][x] - lookup[POT][x - 1]) / (lookup[RAW][x] - lookup[RAW][x - 1])
+            potential_offset = (sensor_raw_norm - lookup[RAW][x - 1]) * potential_per_raw
+            potential = lookup[POT][x - 1] + potential_offset
+            if DEBUG_PARSE >= 3:
+                logdbg("%s: temp=%s fact=%s raw=%s norm=%s potential=%s RAW=%s to %s POT=%s to %s " %
+                       (sensor_name, sensor_temp, norm_fact, sensor_raw,
+                        sensor_raw_norm, potential,
+                        lookup[RAW][x - 1], lookup[RAW][x],
+                        lookup[POT][x - 1], lookup[POT][x]))
     return potential
 
 
 RAW_CHANNEL = 0  # unused channel for the receiver stats in raw format
+RF_CYCLE_TIME = 2500000  # shortest transmit interval of a station in us
 
 
 class MeteostickDriver(weewx.drivers.AbstractDevice, weewx.engine.StdService):
@@ -279,6 +295,11 @@ class MeteostickDriver(weewx.drivers.AbstractDevice, weewx.engine.StdService):
         if 'sensor_map' in stn_dict:
             self.sensor_map.update(stn_dict['sensor_map'])
         loginf('sensor map is: %s' % self.sensor_map)
+        # index the sensor map by sensor name, since a packet contains only a
+        # few of the sensors in the map
+        self.sensor_fields = dict()
+        for k in self.sensor_map:
+            self.sensor_fields.setdefault(self.sensor_map[k], []).append(k)
         self.max_tries = int(stn_dict.get('max_tries', 10))
         self.retry_wait = int(stn_dict.get('retry_wait', 10))
         self.last_rain_count = None
@@ -305,38 +326,46 @@ class MeteostickDriver(weewx.drivers.AbstractDevice, weewx.engine.StdService):
         return 'Meteostick'
 
     def genLoopPackets(self):
+        # none of these change while the loop runs, so look them up once
+        get_readings = self.station.get_readings_with_retry
+        parse_readings = self.station.parse_readings
+        update_rf_stats = self._update_rf_stats
+        data_to_packet = self._data_to_packet
+        max_tries = self.max_tries
+        retry_wait = self.retry_wait
+        rain_per_tip = self.rain_per_tip
         while True:
-            readings = self.station.get_readings_with_retry(self.max_tries,
-                                                            self.retry_wait)
-            data = self.station.parse_readings(readings, self.rain_per_tip)
+            readings = get_readings(max_tries, retry_wait)
+            data = parse_readings(readings, rain_per_tip)
             if 'channel' in data:
-                self._update_rf_stats(data['channel'], data['rf_signal'],
-                                      data['rf_missed'])
+                update_rf_stats(data['channel'], data['rf_signal'],
+                                data['rf_missed'])
             if data:
-                dbg_parse(2, "data: %s" % data)
-                packet = self._data_to_packet(data)
+                if DEBUG_PARSE >= 2:
+                    logdbg("data: %s" % data)
+                packet = data_to_packet(data)
                 if packet is not None:
-                    dbg_parse(3, "packet: %s" % packet)
+                    if DEBUG_PARSE >= 3:
+                        logdbg("packet: %s" % packet)
                     yield packet
 
     def _data_to_packet(self, data):
         packet = dict()
         # map sensor observations to database field names
-        for k in self.sensor_map:
-            if self.sensor_map[k] in data:
-                packet[k] = data[self.sensor_map[k]]
+        for s in data:
+            for k in self.sensor_fields.get(s, ()):
+                packet[k] = data[s]
         # convert the rain count to a rain delta measure
         if 'rain_count' in data:
             if self.last_rain_count is not None:
-                rain_count = data['rain_count'] - self.last_rain_count
+                # the counter is 7 bits, so masking the difference also
+                # handles the wrap around from 127 to 0
+                rain_count = (data['rain_count'] - self.last_rain_count) & 0x7F
+                if DEBUG_RAIN and data['rain_count'] < self.last_rain_count:
+                    logdbg("rain counter wraparound detected rain_count=%s" %
+                           rain_count)
             else:
                 rain_count = 0
-            # handle rain counter wrap around from 127 to 0
-            if rain_count < 0:
-                if DEBUG_RAIN:
-                    logdbg("rain counter wraparound detected rain_count=%s" %
-                       rain_count)
-                rain_count += 128
             self.last_rain_count = data['rain_count']
             packet['rain'] = float(rain_count) * self.rain_per_tip
             if DEBUG_RAIN:
@@ -344,7 +373,8 @@ class MeteostickDriver(weewx.drivers.AbstractDevice, weewx.engine.StdService):
                        (packet['rain'], rain_count, self.last_rain_count))
         elif len(packet) <= 1:
             # No data found
-            dbg_parse(3, "skip packet for data: %s" % data)
+            if DEBUG_PARSE >= 3:
+                logdbg("skip packet for data: %s" % data)
             return None
         packet['dateTime'] = int(time.time() + 0.5)
         packet['usUnits'] = weewx.METRICWX
@@ -471,6 +501,11 @@ class Meteostick(object):
         else:
             channels['wind_channel'] = channels['anemometer']
         self.channels = channels
+        # the channel assignments are fixed for the life of the driver, so
+        # resolve the arguments for parse_raw once instead of for each packet
+        self.parse_channels = (
+            channels['iss'], channels['anemometer'], channels['leaf_soil'],
+            channels['temp_hum_1'], channels['temp_hum_2'])
         loginf('using iss_channel %s' % channels['iss'])
         loginf('using anemometer_channel %s' % channels['anemometer'])
         loginf('using leaf_soil_channel %s' % channels['leaf_soil'])
@@ -484,25 +519,25 @@ class Meteostick(object):
 
         self.timeout = 3 # seconds
         self.serial_port = None
+        self._rxbuf = bytearray() # received data not yet returned as a line
 
     @staticmethod
     def ch_to_xmit(iss_channel, anemometer_channel, leaf_soil_channel,
                    temp_hum_1_channel, temp_hum_2_channel):
+        # one bit per channel; or the bits so that two transmitters that
+        # share a channel do not corrupt the mask
         transmitters = 0
-        transmitters += 1 << (iss_channel - 1)
-        if anemometer_channel != 0:
-            transmitters += 1 << (anemometer_channel - 1)
-        if leaf_soil_channel != 0:
-            transmitters += 1 << (leaf_soil_channel - 1)
-        if temp_hum_1_channel != 0:
-            transmitters += 1 << (temp_hum_1_channel - 1)
-        if temp_hum_2_channel != 0:
-            transmitters += 1 << (temp_hum_2_channel - 1)
+        for ch in (iss_channel, anemometer_channel, leaf_soil_channel,
+                   temp_hum_1_channel, temp_hum_2_channel):
+            if ch != 0:
+                transmitters |= 1 << (ch - 1)
         return transmitters
 
     @staticmethod
     def _check_crc(msg, chksum):
-        crc_result = crc16(msg)
+        # crc_hqx is the same CRC-CCITT (polynomial 0x1021) as weewx.crc16,
+        # but implemented in C
+        crc_result = binascii.crc_hqx(msg, 0)
         if crc_result != chksum:
             logerr('CRC result is 0x%04x, should be 0x%04x' %
                           (crc_result, chksum))
@@ -519,6 +554,7 @@ class Meteostick(object):
         dbg_serial(1, "open serial port %s" % self.port)
         self.serial_port = serial.Serial(self.port, self.baudrate,
                                          timeout=self.timeout)
+        self._rxbuf = bytearray()
 
     def close(self):
         if self.serial_port is not None:
@@ -527,11 +563,22 @@ class Meteostick(object):
             self.serial_port = None
 
     def get_readings(self):
-        buf = self.serial_port.readline().decode('utf-8')
-        if len(buf) > 0:
-            dbg_serial(2, "station said: %s" %
-                       ' '.join(["%0.2X" % ord(c) for c in buf]))
-        return buf.strip()
+        # Read whatever the port has buffered rather than using readline,
+        # which reads a single byte per call, and return one line per call.
+        # Return an empty reading if no complete line arrives in time.
+        while b'\n' not in self._rxbuf:
+            buf = self.serial_port.read(max(1, self.serial_port.inWaiting()))
+            if not buf:
+                return ''
+            self._rxbuf.extend(buf)
+        idx = self._rxbuf.index(b'\n') + 1
+        buf = bytes(self._rxbuf[:idx])
+        del self._rxbuf[:idx]
+        if DEBUG_SERIAL >= 2:
+            # only build the hex dump when it will actually be logged
+            logdbg("station said: %s" %
+                   ' '.join(["%0.2X" % c for c in bytearray(buf)]))
+        return buf.decode('utf-8').strip()
 
     def get_readings_with_retry(self, max_tries=5, retry_wait=10):
         for ntries in range(0, max_tries):
@@ -552,28 +599,38 @@ class Meteostick(object):
 
         # flush any previous data in the input buffer
         self.serial_port.flushInput()
+        self._rxbuf = bytearray()
 
         # Send a reset command
         self.serial_port.write(b'r\n')
-        # Wait until we see the ? character
-        start_ts = time.time()
-        ready = False
-        response = ''
-        while not ready:
-            time.sleep(0.1)
-            while self.serial_port.inWaiting() > 0:
-                c = self.serial_port.read(1).decode('utf-8')
-                if c == '?':
-                    ready = True
-                elif c in string.printable:
-                    response += c
-            if time.time() - start_ts > max_wait:
-                raise weewx.WakeupError("No 'ready' response from meteostick after %s seconds" % max_wait)
+        # Wait until we see the ? character.  Block in the serial read
+        # instead of polling, for at most max_wait seconds.
+        self.serial_port.timeout = max_wait
+        try:
+            if hasattr(self.serial_port, 'read_until'):
+                buf = self.serial_port.read_until(b'?')
+            else:
+                # pyserial 2 has no read_until, so read a byte at a time
+                start_ts = time.time()
+                buf = b''
+                while not buf.endswith(b'?') \
+                        and time.time() - start_ts <= max_wait:
+                    c = self.serial_port.read(1)
+                    if not c:
+                        break
+                    buf += c
+        finally:
+            self.serial_port.timeout = self.timeout
+        if not buf.endswith(b'?'):
+            raise weewx.WakeupError("No 'ready' response from meteostick after %s seconds" % max_wait)
+        response = ''.join([c for c in buf[:-1].decode('utf-8', 'ignore')
+                            if c in string.printable])
         loginf("reset: %s" % response.split('\n')[0])
         dbg_serial(2, "full response to reset: %s" % response)
         # Discard any serial input from the device
         time.sleep(0.2)
         self.serial_port.flushInput()
+        self._rxbuf = bytearray()
         return response
 
     def configure(self):
@@ -619,10 +676,11 @@ class Meteostick(object):
 
     @staticmethod
     def get_parts(raw):
-        raw_str = str(raw)
-        dbg_parse(1, "readings: %s" % raw_str)
-        parts = raw.split(' ')
-        dbg_parse(3, "parts: %s (%s)" % (parts, len(parts)))
+        if DEBUG_PARSE >= 1:
+            logdbg("readings: %s" % raw)
+        parts = raw.split()
+        if DEBUG_PARSE >= 3:
+            logdbg("parts: %s (%s)" % (parts, len(parts)))
         if len(parts) < 2:
             raise ValueError("not enough parts in '%s'" % raw)
         return parts
@@ -631,17 +689,16 @@ class Meteostick(object):
         data = dict()
         if not raw:
             return data
+        if raw[0] == '#':
+            # comment or status line from the stick, nothing to decode
+            loginf("%s" % raw)
+            return data
         if not all(c in string.printable for c in raw):
             logerr("unprintable characters in readings: %s" % _fmt(raw))
             return data
         try:
-            data = self.parse_raw(raw,
-                                  self.channels['iss'],
-                                  self.channels['anemometer'],
-                                  self.channels['leaf_soil'],
-                                  self.channels['temp_hum_1'],
-                                  self.channels['temp_hum_2'],
-                                  rain_per_tip)
+            data = self.parse_raw(raw, *self.parse_channels,
+                                  rain_per_tip=rain_per_tip)
         except ValueError as e:
             logerr("parse failed for '%s': %s" % (raw, e))
         return data
@@ -651,69 +708,58 @@ class Meteostick(object):
         data = dict()
         parts = Meteostick.get_parts(raw)
         n = len(parts)
-        if parts[0] == 'B':
-            # message example:
-            # B 29530 338141 366 101094 60 37
-            data['channel'] = RAW_CHANNEL # rf_signal data will not be used
-            data['rf_signal'] = 0  # not available
-            data['rf_missed'] = 0  # not available
-            if n >= 6:
-                data['temp_in'] = float(parts[3]) / 10.0 # C
-                data['pressure'] = float(parts[4]) / 100.0 # hPa
-                if n > 7:
-                    # only with custom receiver
-                    data['humidity_in'] = float(parts[7])
-            else:
-                logerr("B: not enough parts (%s) in '%s'" % (n, raw))
-        elif parts[0] == 'I':
+        # nearly every line is a sensor message, so test for that first
+        if parts[0] == 'I':
             # raw Davis sensor message in 10 byte format incl header and
             # additional info
             # message example:
             #       ---- raw message ----  rfs ts_last
             # I 102 51 0 DB FF 73 0 11 41  -65 5249944 202
-            raw_msg = [0] * 10
-            for i in range(0, 10):
-                raw_msg[i] = parts[i + 2]
-            pkt = bytearray([int(i, base=16) for i in raw_msg])
+            if n < 14:
+                # truncated or garbled line; reject it before any decoding
+                logerr("I: not enough parts (%s) in '%s'" % (n, raw))
+                return data
+            # decode the 10 hex tokens in a single pass
+            pkt = bytearray([int(t, 16) for t in parts[2:12]])
 
             # perform crc-check
-            raw_msg_crc = [0] * 8
             if pkt[8] == 0xFF and pkt[9] == 0xFF:
                 # message received from davis equipment
                 # Calculate crc with bytes 0-7, result must be equal to 0
-                chksum = 0
-                for i in range(0, 8):
-                    raw_msg_crc[i] = chr(int(parts[i + 2], 16))
-                Meteostick._check_crc(raw_msg_crc, chksum)
+                Meteostick._check_crc(pkt[:8], 0)
             else:
                 # message received via repeater
                 # Calculate crc with bytes 0-5 and 8-9, result must be equal
                 # to bytes 6-7
                 chksum = (pkt[6] << 8) + pkt[7]
-                for i in range(0, 6):
-                    raw_msg_crc[i] = chr(int(parts[i + 2], 16))
-                for i in range(6, 8):
-                    raw_msg_crc[i] = chr(int(parts[i + 4], 16))
-                Meteostick._check_crc(raw_msg_crc, chksum)
+                Meteostick._check_crc(pkt[:6] + pkt[8:10], chksum)
 
-            data['channel'] = (pkt[0] & 0x7) + 1
+            ch = (pkt[0] & 0x7) + 1
+            data['channel'] = ch
             battery_low = (pkt[0] >> 3) & 0x1
-            data['rf_signal'] = int(parts[13])
-            time_since_last = int(parts[14])
+            data['rf_signal'] = int(parts[12])
+            time_since_last = int(parts[13])
             # the cyclus time varies from 2.5 to 3 seconds for channels 1 to 8
-            # simplifiy calculation with max cyclus time of 3.0 seconds
-            data['rf_missed'] = (time_since_last // 2500000) - 1
+            # simplify calculation with the shortest cyclus time
+            data['rf_missed'] = (time_since_last // RF_CYCLE_TIME) - 1
             if data['rf_missed'] > 0:
-                dbg_parse(3, "channel %s missed %s" %
-                          (data['channel'], data['rf_missed']))
+                if DEBUG_PARSE >= 3:
+                    logdbg("channel %s missed %s" %
+                           (ch, data['rf_missed']))
 
-            if data['channel'] == iss_ch or data['channel'] == wind_ch \
-                    or data['channel'] == th1_ch or data['channel'] == th2_ch:
-                if data['channel'] == iss_ch:
+            if ch not in (iss_ch, wind_ch, ls_ch, th1_ch, th2_ch):
+                # reject transmitters we are not configured for before doing
+                # any decoding of the sensor data
+                logerr("unknown station with channel: %s, raw message: %s" %
+                       (ch, raw))
+                return data
+
+            if ch == iss_ch or ch == wind_ch or ch == th1_ch or ch == th2_ch:
+                if ch == iss_ch:
                     data['bat_iss'] = battery_low
-                elif data['channel'] == wind_ch:
+                elif ch == wind_ch:
                     data['bat_anemometer'] = battery_low
-                elif data['channel'] == th1_ch:
+                elif ch == th1_ch:
                     data['bat_th_1'] = battery_low
                 else:
                     data['bat_th_2'] = battery_low
@@ -725,7 +771,7 @@ class Meteostick(object):
                 # I 101 E0 0 0 4E 5 0 72 61  -68 2562440 68 (no sensor)
                 wind_speed_raw = pkt[1]
                 wind_dir_raw = pkt[2]
-                if not(wind_speed_raw == 0 and wind_dir_raw == 0):
+                if wind_speed_raw or wind_dir_raw:
                     """ The elder Vantage Pro and Pro2 stations measured
                     the wind direction with a potentiometer. This type has
                     a fairly big dead band around the North. The Vantage
@@ -737,8 +783,9 @@ class Meteostick(object):
                     For now we use the traditional 'pro' formula for all
                     wind directions.
                     """
-                    dbg_parse(3, "wind_speed_raw=%03x wind_dir_raw=0x%03x" %
-                              (wind_speed_raw, wind_dir_raw))
+                    if DEBUG_PARSE >= 3:
+                        logdbg("wind_speed_raw=%03x wind_dir_raw=0x%03x" %
+                               (wind_speed_raw, wind_dir_raw))
 
                     # Vantage Pro and Pro2
                     if wind_dir_raw == 0:
@@ -746,10 +793,7 @@ class Meteostick(object):
                     elif wind_dir_raw == 255:
                         wind_dir_pro = 355.0
                     else:
-                        wind_dir_pro = 9.0 + (wind_dir_raw - 1) * 342.0 / 253.0
-
-                    # Vantage Vue
-                    wind_dir_vue = wind_dir_raw * 1.40625 + 0.3
+                        wind_dir_pro = 9.0 + (wind_dir_raw - 1) * WIND_DIR_PRO_SCALE
 
                     # wind error correction is by raw byte values
                     wind_speed_ec = round(Meteostick.calc_wind_speed_ec(wind_speed_raw, wind_dir_raw))
@@ -758,11 +802,14 @@ class Meteostick(object):
                     data['wind_speed_raw'] = wind_speed_raw
                     data['wind_dir'] = wind_dir_pro
                     data['wind_speed'] = wind_speed_ec * MPH_TO_MPS
-                    dbg_parse(3, "WS=%s WD=%s WS_raw=%s WS_ec=%s WD_raw=%s WD_pro=%s WD_vue=%s" %
-                              (data['wind_speed'], data['wind_dir'],
-                               wind_speed_raw, wind_speed_ec,
-                               wind_dir_raw if wind_dir_raw <= 180 else 360 - wind_dir_raw,
-                               wind_dir_pro, wind_dir_vue))
+                    if DEBUG_PARSE >= 3:
+                        # Vantage Vue, only reported for comparison
+                        wind_dir_vue = wind_dir_raw * 1.40625 + 0.3
+                        logdbg("WS=%s WD=%s WS_raw=%s WS_ec=%s WD_raw=%s WD_pro=%s WD_vue=%s" %
+                               (data['wind_speed'], data['wind_dir'],
+                                wind_speed_raw, wind_speed_ec,
+                                wind_dir_raw if wind_dir_raw <= 180 else 360 - wind_dir_raw,
+                                wind_dir_pro, wind_dir_vue))
 
                 # data from both iss sensors and extra sensors on
                 # Anemometer Transport Kit
@@ -778,16 +825,18 @@ class Meteostick(object):
                     supercap_volt_raw = ((pkt[3] << 2) + (pkt[4] >> 6)) & 0x3FF
                     if supercap_volt_raw != 0x3FF:
                         data['supercap_volt'] = supercap_volt_raw / 300.0
-                        dbg_parse(3, "supercap_volt_raw=0x%03x value=%s" %
-                                  (supercap_volt_raw, data['supercap_volt']))
+                        if DEBUG_PARSE >= 3:
+                            logdbg("supercap_volt_raw=0x%03x value=%s" %
+                                   (supercap_volt_raw, data['supercap_volt']))
                 elif message_type == 3:
                     # unknown message type
                     # message examples:
                     # TODO
                     # TODO (no sensor)
-                    dbg_parse(1, "unknown message with type=0x03; "
-                              "pkt[3]=0x%02x pkt[4]=0x%02x pkt[5]=0x%02x"
-                              % (pkt[3], pkt[4], pkt[5]))
+                    if DEBUG_PARSE >= 1:
+                        logdbg("unknown message with type=0x03; "
+                               "pkt[3]=0x%02x pkt[4]=0x%02x pkt[5]=0x%02x"
+                               % (pkt[3], pkt[4], pkt[5]))
                 elif message_type == 4:
                     # uv
                     # message examples:
@@ -796,8 +845,9 @@ class Meteostick(object):
                     uv_raw = ((pkt[3] << 2) + (pkt[4] >> 6)) & 0x3FF
                     if uv_raw != 0x3FF:
                         data['uv'] = uv_raw / 50.0
-                        dbg_parse(3, "uv_raw=%04x value=%s" %
-                                  (uv_raw, data['uv']))
+                        if DEBUG_PARSE >= 3:
+                            logdbg("uv_raw=%04x value=%s" %
+                                   (uv_raw, data['uv']))
                 elif message_type == 5:
                     # rain rate
                     # message examples:
@@ -812,28 +862,31 @@ class Meteostick(object):
                     """
                     # typical time between tips: 64-1022
                     time_between_tips_raw = ((pkt[4] & 0x30) << 4) + pkt[3]
-                    dbg_parse(3, "time_between_tips_raw=%03x (%s)" %
-                              (time_between_tips_raw, time_between_tips_raw))
-                    if data['channel'] == iss_ch: # rain sensor is present
+                    if DEBUG_PARSE >= 3:
+                        logdbg("time_between_tips_raw=%03x (%s)" %
+                               (time_between_tips_raw, time_between_tips_raw))
+                    if ch == iss_ch: # rain sensor is present
                         rain_rate = None
                         if time_between_tips_raw == 0x3FF:
                             # no rain
                             rain_rate = 0
-                            dbg_parse(3, "no_rain=%s mm/h" % rain_rate)
+                            if DEBUG_PARSE >= 3:
+                                logdbg("no_rain=%s mm/h" % rain_rate)
                         elif pkt[4] & 0x40 == 0:
                             # heavy rain. typical value:
                             # 64/16 - 1020/16 = 4 - 63.8 (180.0 - 11.1 mm/h)
-                            time_between_tips = time_between_tips_raw / 16.0
-                            rain_rate = 3600.0 / time_between_tips * rain_per_tip
-                            dbg_parse(3, "heavy_rain=%s mm/h, time_between_tips=%s s" %
-                                      (rain_rate, time_between_tips))
+                            # 3600 / (raw / 16) folded into a single divide
+                            rain_rate = 57600.0 / time_between_tips_raw * rain_per_tip
+                            if DEBUG_PARSE >= 3:
+                                logdbg("heavy_rain=%s mm/h, time_between_tips=%s s" %
+                                       (rain_rate, time_between_tips_raw / 16.0))
                         else:
                             # light rain. typical value:
                             # 64 - 1022 (11.1 - 0.8 mm/h)
-                            time_between_tips = time_between_tips_raw
-                            rain_rate = 3600.0 / time_between_tips * rain_per_tip
-                            dbg_parse(3, "light_rain=%s mm/h, time_between_tips=%s s" %
-                                      (rain_rate, time_between_tips))
+                            rain_rate = 3600.0 / time_between_tips_raw * rain_per_tip
+                            if DEBUG_PARSE >= 3:
+                                logdbg("light_rain=%s mm/h, time_between_tips=%s s" %
+                                       (rain_rate, time_between_tips_raw))
                         data['rain_rate'] = rain_rate
                 elif message_type == 6:
                     # solar radiation
@@ -843,8 +896,9 @@ class Meteostick(object):
                     sr_raw = ((pkt[3] << 2) + (pkt[4] >> 6)) & 0x3FF
                     if sr_raw < 0x3FE:
                         data['solar_radiation'] = sr_raw * 1.757936
-                        dbg_parse(3, "solar_radiation_raw=0x%04x value=%s"
-                                  % (sr_raw, data['solar_radiation']))
+                        if DEBUG_PARSE >= 3:
+                            logdbg("solar_radiation_raw=0x%04x value=%s"
+                                   % (sr_raw, data['solar_radiation']))
                 elif message_type == 7:
                     # solar cell output / solar power (Vue only)
                     # message example:
@@ -856,8 +910,9 @@ class Meteostick(object):
                     solar_power_raw = ((pkt[3] << 2) + (pkt[4] >> 6)) & 0x3FF
                     if solar_power_raw != 0x3FF:
                         data['solar_power'] = solar_power_raw / 300.0
-                        dbg_parse(3, "solar_power_raw=0x%03x solar_power=%s"
-                                  % (solar_power_raw, data['solar_power']))
+                        if DEBUG_PARSE >= 3:
+                            logdbg("solar_power_raw=0x%03x solar_power=%s"
+                                   % (solar_power_raw, data['solar_power']))
                 elif message_type == 8:
                     # outside temperature
                     # message examples:
@@ -874,20 +929,22 @@ class Meteostick(object):
                                 temp_f = -(temp_raw ^ 0xFFF) / 10.0
                             else:
                                 temp_f = temp_raw / 10.0
-                            temp_c = weewx.wxformulas.FtoC(temp_f) # C
-                            dbg_parse(3, "digital temp_raw=0x%03x temp_f=%s temp_c=%s"
-                                      % (temp_raw, temp_f, temp_c))
+                            temp_c = (temp_f - 32.0) * 5.0 / 9.0 # C
+                            if DEBUG_PARSE >= 3:
+                                logdbg("digital temp_raw=0x%03x temp_f=%s temp_c=%s"
+                                       % (temp_raw, temp_f, temp_c))
                         else:
                             # analog sensor (thermistor)
                             temp_raw = temp_raw // 4  # 10-bits temp value
                             temp_c = calculate_thermistor_temp(temp_raw)
-                            dbg_parse(3, "thermistor temp_raw=0x%03x temp_c=%s"
-                                      % (temp_raw, temp_c))
-                        if data['channel'] == th1_ch:
+                            if DEBUG_PARSE >= 3:
+                                logdbg("thermistor temp_raw=0x%03x temp_c=%s"
+                                       % (temp_raw, temp_c))
+                        if ch == th1_ch:
                             data['temp_1'] = temp_c
-                        elif data['channel'] == th2_ch:
+                        elif ch == th2_ch:
                             data['temp_2'] = temp_c
-                        elif data['channel'] == wind_ch:
+                        elif ch == wind_ch:
                             data['temp_3'] = temp_c
                         else:
                             data['temperature'] = temp_c
@@ -896,13 +953,15 @@ class Meteostick(object):
                     # message examples:
                     # I 102 91 0 DB 0 3 E 89 85  -66 2624972 204
                     # I 102 90 0 0 0 5 0 31 51  -75 2562456 223 (no sensor)
-                    gust_raw = pkt[3]  # mph
-                    gust_index_raw = pkt[5] >> 4
-                    if not(gust_raw == 0 and gust_index_raw == 0):
-                        dbg_parse(3, "W10=%s gust_index_raw=%s" %
-                                  (gust_raw, gust_index_raw))
-                        # don't store the 10-min gust data because there is no
-                        # field for it reserved in the standard wview schema
+                    # don't store the 10-min gust data because there is no
+                    # field for it reserved in the standard wview schema, so
+                    # only decode it when it will be logged
+                    if DEBUG_PARSE >= 3:
+                        gust_raw = pkt[3]  # mph
+                        gust_index_raw = pkt[5] >> 4
+                        if not(gust_raw == 0 and gust_index_raw == 0):
+                            logdbg("W10=%s gust_index_raw=%s" %
+                                   (gust_raw, gust_index_raw))
                 elif message_type == 0xA:
                     # outside humidity
                     # message examples:
@@ -919,16 +978,17 @@ class Meteostick(object):
                         else:
                             # analog sensor (pkt[4] & 0x0f == 0x5)
                             humidity = humidity_raw * -0.301 + 710.23
-                        if data['channel'] == th1_ch:
+                        if ch == th1_ch:
                             data['humid_1'] = humidity
-                        elif data['channel'] == th2_ch:
+                        elif ch == th2_ch:
                             data['humid_2'] = humidity
-                        elif data['channel'] == wind_ch:
+                        elif ch == wind_ch:
                             loginf("Warning: humidity sensor of Anemometer Transmitter Kit not in sensor map: %s" % humidity)
                         else:
                             data['humidity'] = humidity
-                        dbg_parse(3, "humidity_raw=0x%03x value=%s" %
-                                  (humidity_raw, humidity))
+                        if DEBUG_PARSE >= 3:
+                            logdbg("humidity_raw=0x%03x value=%s" %
+                                   (humidity_raw, humidity))
                 elif message_type == 0xC:
                     # unknown message
                     # message example:
@@ -936,8 +996,9 @@ class Meteostick(object):
                     # As we have seen after one day of received data
                     # pkt[3] and pkt[5] are always zero;
                     # pckt[4] has values 0-3 (ATK) or 5 (temp/hum)
-                    dbg_parse(3, "unknown pkt[3]=0x%02x pkt[4]=0x%02x pkt[5]=0x%02x" %
-                              (pkt[3], pkt[4], pkt[5]))
+                    if DEBUG_PARSE >= 3:
+                        logdbg("unknown pkt[3]=0x%02x pkt[4]=0x%02x pkt[5]=0x%02x" %
+                               (pkt[3], pkt[4], pkt[5]))
                 elif message_type == 0xE:
                     # rain
                     # message examples:
@@ -951,13 +1012,14 @@ class Meteostick(object):
                     if rain_count_raw != 0x80:
                         rain_count = rain_count_raw & 0x7F  # skip high bit
                         data['rain_count'] = rain_count
-                        dbg_parse(3, "rain_count_raw=0x%02x value=%s" %
-                                  (rain_count_raw, rain_count))
+                        if DEBUG_PARSE >= 3:
+                            logdbg("rain_count_raw=0x%02x value=%s" %
+                                   (rain_count_raw, rain_count))
                 else:
                     # unknown message type
                     logerr("unknown message type 0x%01x" % message_type)
 
-            elif data['channel'] == ls_ch:
+            else:
                 # leaf and soil station
                 data['bat_leaf_soil'] = battery_low
                 data_type = pkt[0] >> 4
@@ -976,9 +1038,10 @@ class Meteostick(object):
                         if pkt[3] != 0xFF:
                             # soil temperature
                             temp_c = calculate_thermistor_temp(temp_raw)
-                            data['soil_temp_%s' % sensor_num] = temp_c
-                            dbg_parse(3, "soil_temp_%s=%s 0x%03x" %
-                                      (sensor_num, temp_c, temp_raw))
+                            data[SOIL_TEMP_KEYS[sensor_num]] = temp_c
+                            if DEBUG_PARSE >= 3:
+                                logdbg("soil_temp_%s=%s 0x%03x" %
+                                       (sensor_num, temp_c, temp_raw))
                         if pkt[2] != 0xFF:
                             # soil moisture potential
                             # Lookup soil moisture potential in SM_MAP
@@ -986,9 +1049,10 @@ class Meteostick(object):
                             soil_moisture = lookup_potential(
                                 "soil_moisture", norm_fact,
                                 potential_raw, temp_c, SM_MAP)
-                            data['soil_moisture_%s' % sensor_num] = soil_moisture
-                            dbg_parse(3, "soil_moisture_%s=%s 0x%03x" %
-                                      (sensor_num, soil_moisture, potential_raw))
+                            data[SOIL_MOISTURE_KEYS[sensor_num]] = soil_moisture
+                            if DEBUG_PARSE >= 3:
+                                logdbg("soil_moisture_%s=%s 0x%03x" %
+                                       (sensor_num, soil_moisture, potential_raw))
                     elif data_subtype == 2:
                         # leaf wetness
                         # message examples:
@@ -997,9 +1061,10 @@ class Meteostick(object):
                         if pkt[3] != 0xFF:
                             # leaf temperature
                             temp_c = calculate_thermistor_temp(temp_raw)
-                            data['leaf_temp_%s' % sensor_num] = temp_c
-                            dbg_parse(3, "leaf_temp_%s=%s 0x%03x" %
-                                      (sensor_num, temp_c, temp_raw))
+                            data[LEAF_TEMP_KEYS[sensor_num]] = temp_c
+                            if DEBUG_PARSE >= 3:
+                                logdbg("leaf_temp_%s=%s 0x%03x" %
+                                       (sensor_num, temp_c, temp_raw))
                         if pkt[2] != 0:
                             # leaf wetness potential
                             # Lookup leaf wetness potential in LW_MAP
@@ -1007,17 +1072,26 @@ class Meteostick(object):
                             leaf_wetness = lookup_potential(
                                 "leaf_wetness", norm_fact,
                                 potential_raw, temp_c, LW_MAP)
-                            data['leaf_wetness_%s' % sensor_num] = leaf_wetness
-                            dbg_parse(3, "leaf_wetness_%s=%s 0x%03x" %
-                                      (sensor_num, leaf_wetness, potential_raw))
+                            data[LEAF_WETNESS_KEYS[sensor_num]] = leaf_wetness
+                            if DEBUG_PARSE >= 3:
+                                logdbg("leaf_wetness_%s=%s 0x%03x" %
+                                       (sensor_num, leaf_wetness, potential_raw))
                     else:
                         logerr("unknown subtype '%s' in '%s'" % (data_subtype, raw))
-
+        elif parts[0] == 'B':
+            # message example:
+            # B 29530 338141 366 101094 60 37
+            data['channel'] = RAW_CHANNEL # rf_signal data will not be used
+            data['rf_signal'] = 0  # not available
+            data['rf_missed'] = 0  # not available
+            if n >= 6:
+                data['temp_in'] = float(parts[3]) / 10.0 # C
+                data['pressure'] = float(parts[4]) / 100.0 # hPa
+                if n > 7:
+                    # only with custom receiver
+                    data['humidity_in'] = float(parts[7])
             else:
-                logerr("unknown station with channel: %s, raw message: %s" %
-                       (data['channel'], raw))
-        elif parts[0] == '#':
-            loginf("%s" % raw)
+                logerr("B: not enough parts (%s) in '%s'" % (n, raw))
         else:
             logerr("unknown sensor identifier '%s' in %s" % (parts[0], raw))
         return data
@@ -1154,8 +1228,9 @@ class Meteostick(object):
                     y0, y1,
                     x, y):
 
-        dbg_parse(3, "rx0=%s, rx1=%s, ry0=%s, ry1=%s, x0=%s, x1=%s, y0=%s, y1=%s, x=%s, y=%s" %
-                  (rx0, rx1, ry0, ry1, x0, x1, y0, y1, x, y))
+        if DEBUG_PARSE >= 3:
+            logdbg("rx0=%s, rx1=%s, ry0=%s, ry1=%s, x0=%s, x1=%s, y0=%s, y1=%s, x=%s, y=%s" %
+                   (rx0, rx1, ry0, ry1, x0, x1, y0, y1, x, y))
 
         if rx0 == rx1:
             return y + x0 + (y - ry0) / float(ry1 - ry0) * (y1 - y0)
@@ -1275,18 +1350,19 @@ class MeteostickConfigurator(weewx.drivers.AbstractConfigurator):
         info = driver.station.reset()
         if options.info:
             print(info)
-        cfg = {
-            'v': options.verbose,
-            'd': options.debug,
-            'l': options.led,
-            'b': options.bandwidth,
-            'p': options.probe,
-            'r': options.repeater,
-            'c': options.channel,
-            'o': options.format}
-        for opt in cfg:
-            if cfg[opt]:
-                cmd = opt + cfg[opt]
+        # send the settings in a fixed order
+        cfg = (
+            ('v', options.verbose),
+            ('d', options.debug),
+            ('l', options.led),
+            ('b', options.bandwidth),
+            ('p', options.probe),
+            ('r', options.repeater),
+            ('c', options.channel),
+            ('o', options.format))
+        for opt, val in cfg:
+            if val is not None:
+                cmd = '%s%s' % (opt, val)
                 print("set station parameter %s" % cmd)
                 driver.station.send_command(cmd)
         if options.opts:
@@ -1305,8 +1381,15 @@ if __name__ == '__main__':
 
     usage = """%prog [options] [--help]"""
 
-    syslog.openlog('meteostick', syslog.LOG_PID | syslog.LOG_CONS)
-    syslog.setlogmask(syslog.LOG_UPTO(syslog.LOG_DEBUG))
+    try:
+        # weewx 4 and later: syslog is not imported when new-style logging
+        # is available, so set up the weewx logger instead
+        import weeutil.logger
+        weewx.debug = 1
+        weeutil.logger.setup('meteostick', {})
+    except ImportError:
+        syslog.openlog('meteostick', syslog.LOG_PID | syslog.LOG_CONS)
+        syslog.setlogmask(syslog.LOG_UPTO(syslog.LOG_DEBUG))
     parser = optparse.OptionParser(usage=usage)
     parser.add_option('--version', dest='version', action='store_true',
                       help='display driver version')